@@ -6,22 +6,45 @@ Uses IMAP IDLE for minimal latency (2-3 seconds)
 """
 
 import os
+import re
 import sys
+import json
+import logging
 import time
+import random
 import base64
-import email
 import imaplib
+import signal
 import socket
+import ssl
+import selectors
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from email.header import Header
 from email.mime.text import MIMEText
-from datetime import datetime
+from email.utils import parseaddr
+from datetime import datetime, timezone
 from typing import Optional, List, Any, cast
-from email.message import Message
 
+import httplib2
+import requests
+from google.auth import jwt
+from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s %(message)s',
+    stream=sys.stderr
+)
+log = logging.getLogger('gmail_auto_reply')
+
 # Import configuration
 try:
     from config import (
@@ -29,30 +52,90 @@ try:
         AUTO_REPLY_MESSAGE,
         CREDENTIALS_FILE,
         TOKEN_FILE,
+        STATE_FILE,
         GMAIL_SCOPES
     )
 except ImportError:
-    print("\nERROR: config.py not found!")
-    print("Please create config.py with your settings.")
-    print("See config.py.example for reference.")
+    log.error("ERROR: config.py not found!")
+    log.error("Please create config.py with your settings.")
+    log.error("See config.py.example for reference.")
     sys.exit(1)
 
 # Validate configuration - NO DEFAULTS ALLOWED
 if not TARGET_SENDER_EMAIL:
-    print("\nERROR: TARGET_SENDER_EMAIL is not configured!")
-    print("Please edit config.py and set your target sender email address.")
-    print("Example: TARGET_SENDER_EMAIL = 'their.email@example.com'")
+    log.error("ERROR: TARGET_SENDER_EMAIL is not configured!")
+    log.error("Please edit config.py and set your target sender email address.")
+    log.error("Example: TARGET_SENDER_EMAIL = 'their.email@example.com'")
     sys.exit(1)
 
 if not AUTO_REPLY_MESSAGE:
-    print("\nERROR: AUTO_REPLY_MESSAGE is not configured!")
-    print("Please edit config.py and set your auto-reply message.")
-    print("Example: AUTO_REPLY_MESSAGE = 'Got it! I can do it.'")
+    log.error("ERROR: AUTO_REPLY_MESSAGE is not configured!")
+    log.error("Please edit config.py and set your auto-reply message.")
+    log.error("Example: AUTO_REPLY_MESSAGE = 'Got it! I can do it.'")
     sys.exit(1)
 
+# Lower-cased once for case-insensitive sender comparison
+TARGET_SENDER_LOWER = TARGET_SENDER_EMAIL.lower()
+
 # Your Gmail address (will be populated from credentials)
 YOUR_EMAIL = ''
 
+# Header lines longer than this are folded (RFC 5322 recommended limit)
+HEADER_MAX_LINE = 78
+
+# The MIME headers and encoded body are identical for every reply, so they
+# are built once; only the addressing and threading headers vary
+REPLY_MIME_HEADERS, REPLY_MIME_BODY = MIMEText(AUTO_REPLY_MESSAGE).as_bytes().split(b'\n\n', 1)
+
+# Only the headers needed to reply are fetched from IMAP
+HEADER_FETCH_ITEMS = '(BODY.PEEK[HEADER.FIELDS (FROM SUBJECT MESSAGE-ID REFERENCES)])'
+
+# Extracts the UID from a UID FETCH response line
+UID_PATTERN = re.compile(rb'UID (\d+)')
+
+# Extracts the highest mod-sequence from a CONDSTORE SEARCH response
+MODSEQ_PATTERN = re.compile(r'\(MODSEQ (\d+)\)')
+
+# IDLE cycle length in seconds; kept under 10 minutes because servers
+# silently drop idle connections well before the RFC 2177 29-minute limit
+IDLE_TIMEOUT = 570
+
+# Timeout for individual IMAP reads and writes (seconds); the IDLE wait
+# itself is bounded by select(), not by the socket timeout
+IMAP_SOCKET_TIMEOUT = 60
+
+# Socket read size and maximum response line length (same limit as imaplib)
+IMAP_READ_SIZE = 65536
+IMAP_MAX_LINE = 1000000
+
+# TCP keepalive settings (seconds) for detecting dead IMAP connections
+TCP_KEEPALIVE_IDLE = 120
+TCP_KEEPALIVE_INTERVAL = 30
+TCP_KEEPALIVE_COUNT = 3
+
+# Parallel Gmail API workers for replying to existing messages on startup
+REPLY_WORKERS = 4
+
+# Sub-requests per Gmail API batch request (larger batches get rate-limited)
+GMAIL_BATCH_LIMIT = 50
+
+# Reconnect backoff after connection errors (seconds); doubles up to the cap
+RECONNECT_BACKOFF_INITIAL = 5.0
+RECONNECT_BACKOFF_MAX = 300.0
+
+# Upper bound on remembered processed UIDs and cached thread IDs
+# (oldest are evicted first)
+MAX_PROCESSED_MESSAGES = 10000
+
+# Guards the thread ID cache, which reply workers share
+THREAD_ID_CACHE_LOCK = threading.Lock()
+
+# Token refresh transport, reused so refreshes share one keep-alive session
+REFRESH_REQUEST = Request(session=requests.Session())
+
+# Refresh the access token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 60
+
 
 def get_gmail_credentials() -> Credentials:
     """
@@ -63,37 +146,165 @@ def get_gmail_credentials() -> Credentials:
 
     # Token file stores access and refresh tokens
     if os.path.exists(TOKEN_FILE):
-        creds = Credentials.from_authorized_user_file(TOKEN_FILE, GMAIL_SCOPES)
+        # A token granted before scopes were added to config.py cannot be
+        # refreshed with them, so it is replaced by a new authorization
+        if set(GMAIL_SCOPES) <= token_file_scopes():
+            creds = Credentials.from_authorized_user_file(TOKEN_FILE, GMAIL_SCOPES)
+        else:
+            log.info("%s is missing scopes from config.py, re-authenticating...", TOKEN_FILE)
 
     # If no valid credentials, do OAuth2 flow
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
-            print("Refreshing expired token...")
-            creds.refresh(Request())
-        else:
+            log.info("Refreshing expired token...")
+            backoff = RECONNECT_BACKOFF_INITIAL
+            while True:
+                try:
+                    creds.refresh(REFRESH_REQUEST)
+                    break
+                except RefreshError as e:
+                    if not e.retryable:
+                        # Revoked or under-scoped token - authorize again
+                        log.warning("  ✗ Token refresh failed (%s), re-authenticating...", e)
+                        creds = None
+                        break
+
+                    # Token endpoint outage (5xx/429) - wait rather than re-authorize
+                    delay = backoff + random.random()
+                    log.warning("  ✗ Token refresh failed (%s), retrying in %.1f seconds...", e, delay)
+                    time.sleep(delay)
+                    backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+
+        if not creds or not creds.valid:
             if not os.path.exists(CREDENTIALS_FILE):
-                print(f"\nERROR: {CREDENTIALS_FILE} not found!")
-                print("Please download OAuth2 credentials from Google Cloud Console")
-                print("See README.md for setup instructions")
+                log.error("ERROR: %s not found!", CREDENTIALS_FILE)
+                log.error("Please download OAuth2 credentials from Google Cloud Console")
+                log.error("See README.md for setup instructions")
                 sys.exit(1)
 
-            print("Starting OAuth2 authentication flow...")
+            log.info("Starting OAuth2 authentication flow...")
             flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, GMAIL_SCOPES)
             creds = cast(Credentials, flow.run_local_server(port=0))
 
         # Save credentials for future runs
         if creds:
-            with open(TOKEN_FILE, 'w') as token:
-                token.write(creds.to_json())
-            print(f"Credentials saved to {TOKEN_FILE}")
+            save_credentials(creds)
 
     if not creds:
-        print("\nERROR: Failed to get credentials")
+        log.error("ERROR: Failed to get credentials")
         sys.exit(1)
 
     return creds
 
 
+def token_file_scopes() -> set[str]:
+    """
+    Returns the scopes recorded in the token file (empty if unreadable).
+    """
+    try:
+        with open(TOKEN_FILE) as token:
+            scopes = json.load(token).get('scopes') or []
+    except (OSError, ValueError, AttributeError):
+        return set()
+
+    if isinstance(scopes, str):
+        scopes = scopes.split()
+    return set(scopes)
+
+
+def save_credentials(creds: Credentials) -> None:
+    """
+    Writes credentials to the token file.
+    """
+    with open(TOKEN_FILE, 'w') as token:
+        token.write(creds.to_json())
+    log.info("Credentials saved to %s", TOKEN_FILE)
+
+
+def load_imap_state() -> dict[str, int]:
+    """
+    Loads the persisted IMAP state ({'uidvalidity': ..., 'last_uid': ...}).
+    Returns an empty dict if there is no usable state file, or if it was
+    written for a different account or target sender.
+    """
+    if not os.path.exists(STATE_FILE):
+        return {}
+
+    try:
+        with open(STATE_FILE) as f:
+            state = json.load(f)
+        # A UID watermark from another mailbox or sender filter would skip mail
+        if state['username'] != YOUR_EMAIL or state['target_sender'] != TARGET_SENDER_LOWER:
+            log.info("  → %s is for a different account or sender, doing a full scan", STATE_FILE)
+            return {}
+        return {
+            'uidvalidity': int(state['uidvalidity']),
+            'last_uid': int(state['last_uid'])
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def save_imap_state(uidvalidity: int, last_uid: int) -> None:
+    """
+    Persists the INBOX UIDVALIDITY and highest processed UID, along with the
+    account and target sender they belong to.
+    """
+    state = {
+        'username': YOUR_EMAIL,
+        'target_sender': TARGET_SENDER_LOWER,
+        'uidvalidity': uidvalidity,
+        'last_uid': last_uid
+    }
+    with open(STATE_FILE, 'w') as f:
+        json.dump(state, f)
+
+
+def email_from_id_token(creds: Credentials) -> Optional[str]:
+    """
+    Returns the account email from the OAuth2 ID token, if present.
+    Requires the 'openid' and userinfo.email scopes; the ID token is only
+    returned alongside a newly issued or refreshed access token.
+    """
+    if not creds.id_token:
+        return None
+
+    try:
+        # The token came straight from Google's token endpoint over TLS, so
+        # the claims are read without fetching certs to verify the signature
+        claims = jwt.decode(creds.id_token, verify=False)
+    except ValueError:
+        return None
+
+    return claims.get('email')
+
+
+def token_refresh_deadline(creds: Credentials) -> float:
+    """
+    Returns the time.monotonic() deadline at which the access token
+    should be refreshed (TOKEN_REFRESH_MARGIN seconds before expiry).
+    """
+    if not creds.expiry:
+        return float('inf')
+
+    # Credentials.expiry is a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    remaining = (creds.expiry - now).total_seconds()
+    return time.monotonic() + remaining - TOKEN_REFRESH_MARGIN
+
+
+def refresh_credentials(creds: Credentials) -> float:
+    """
+    Refreshes the access token in memory and persists it to the token file.
+
+    Returns:
+        New refresh deadline (see token_refresh_deadline)
+    """
+    creds.refresh(REFRESH_REQUEST)
+    save_credentials(creds)
+    return token_refresh_deadline(creds)
+
+
 def generate_oauth2_string(username: str, access_token: str) -> str:
     """
     Generates OAuth2 authentication string for IMAP.
@@ -102,6 +313,66 @@ def generate_oauth2_string(username: str, access_token: str) -> str:
     return auth_string
 
 
+def format_header(name: str, value: str) -> str:
+    """
+    Returns a 'Name: value' header line. Non-ASCII values are RFC 2047
+    encoded and long values are folded to stay within RFC 5322 line limits.
+    """
+    if value.isascii() and len(name) + 2 + len(value) <= HEADER_MAX_LINE:
+        return f"{name}: {value}"
+
+    charset = 'us-ascii' if value.isascii() else 'utf-8'
+    folded = Header(value, charset, maxlinelen=HEADER_MAX_LINE, header_name=name).encode()
+    return f"{name}: {folded}"
+
+
+def build_reply_body(
+    to_email: str,
+    subject: str,
+    message_id: str,
+    thread_id: Optional[str],
+    references: str
+) -> dict[str, str]:
+    """
+    Builds the Gmail API request body for an auto-reply.
+
+    Args:
+        to_email: Recipient email address
+        subject: Original email subject
+        message_id: Message-ID of original email for threading
+        thread_id: Gmail thread ID
+        references: References header for proper threading
+
+    Returns:
+        Body for users().messages().send()
+    """
+    # Create reply message from the pre-built MIME template
+    reply_subject = f"Re: {subject}" if not subject.startswith('Re:') else subject
+    headers = [
+        format_header('To', to_email),
+        format_header('From', YOUR_EMAIL),
+        format_header('Subject', reply_subject)
+    ]
+
+    # Add threading headers for proper conversation threading
+    if message_id:
+        thread_references = f"{references} {message_id}" if references else message_id
+        headers.append(format_header('In-Reply-To', message_id))
+        headers.append(format_header('References', thread_references))
+
+    message = b'\n'.join([REPLY_MIME_HEADERS, *(h.encode() for h in headers)])
+    message += b'\n\n' + REPLY_MIME_BODY
+
+    # Encode (base64 output is pure ASCII, so skip the general UTF-8 decoder)
+    raw = base64.urlsafe_b64encode(message).decode('ascii')
+    body = {'raw': raw}
+
+    if thread_id:
+        body['threadId'] = thread_id
+
+    return body
+
+
 def send_reply(
     gmail_service: Any,
     to_email: str,
@@ -125,67 +396,422 @@ def send_reply(
         True if reply sent successfully, False otherwise
     """
     try:
-        # Create reply message
-        message = MIMEText(AUTO_REPLY_MESSAGE)
-        message['to'] = to_email
-        message['from'] = YOUR_EMAIL
-        message['subject'] = f"Re: {subject}" if not subject.startswith('Re:') else subject
-
-        # Add threading headers for proper conversation threading
-        if message_id:
-            message['In-Reply-To'] = message_id
-            message['References'] = f"{references} {message_id}" if references else message_id
-
-        # Encode and send
-        raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
-        body = {'raw': raw}
-
-        if thread_id:
-            body['threadId'] = thread_id
+        body = build_reply_body(to_email, subject, message_id, thread_id, references)
 
         result = gmail_service.users().messages().send(
             userId='me',
             body=body
         ).execute()
 
-        print(f"  ✓ Reply sent! Message ID: {result['id']}")
+        log.info("  ✓ Reply sent! Message ID: %s", result['id'])
         return True
 
     except Exception as e:
-        print(f"  ✗ Failed to send reply: {e}")
+        log.error("  ✗ Failed to send reply: %s", e)
         return False
 
 
+def lookup_thread_id(
+    gmail_service: Any,
+    message_id_header: str,
+    thread_id_cache: OrderedDict[str, str],
+    http: Optional[Any] = None
+) -> Optional[str]:
+    """
+    Resolves the Gmail thread ID for a message by its Message-ID header.
+    Results are cached so repeated lookups skip the API round-trip; the
+    least recently used entries are evicted past MAX_PROCESSED_MESSAGES.
+
+    Args:
+        gmail_service: Authorized Gmail API service instance
+        message_id_header: Message-ID header of the received email
+        thread_id_cache: Message-ID -> threadId LRU cache
+        http: HTTP object to execute the request with (None for the service default)
+
+    Returns:
+        Gmail thread ID, or None if the message could not be found
+    """
+    if not message_id_header:
+        return None
+
+    with THREAD_ID_CACHE_LOCK:
+        if message_id_header in thread_id_cache:
+            thread_id_cache.move_to_end(message_id_header)
+            return thread_id_cache[message_id_header]
+
+    # rfc822msgid matches the exact message rather than the latest from sender
+    result = gmail_service.users().messages().list(
+        userId='me',
+        q=f'rfc822msgid:{message_id_header}',
+        maxResults=1
+    ).execute(http=http)
+
+    if 'messages' in result and result['messages']:
+        thread_id = result['messages'][0]['threadId']
+        with THREAD_ID_CACHE_LOCK:
+            thread_id_cache[message_id_header] = thread_id
+            thread_id_cache.move_to_end(message_id_header)
+            while len(thread_id_cache) > MAX_PROCESSED_MESSAGES:
+                thread_id_cache.popitem(last=False)
+        return thread_id
+    return None
+
+
+@lru_cache(maxsize=1024)
 def parse_email_from(from_header: str) -> str:
     """
     Extracts email address from From header.
-    Handles formats like "Name <email@example.com>" or "email@example.com"
+    Handles formats like "Name <email@example.com>" or "email@example.com",
+    including quoted display names containing '<'.
+    """
+    return parseaddr(from_header)[1].lower()
+
+
+def remember_processed(processed: OrderedDict[str, None], msg_ids: List[str]) -> None:
+    """
+    Records processed message UIDs, evicting the oldest entries once
+    MAX_PROCESSED_MESSAGES is exceeded.
+    """
+    for msg_id in msg_ids:
+        processed[msg_id] = None
+        processed.move_to_end(msg_id)
+
+    while len(processed) > MAX_PROCESSED_MESSAGES:
+        processed.popitem(last=False)
+
+
+def advance_last_uid(last_uid: int, requested: List[str], handled: List[str]) -> int:
     """
-    if '<' in from_header and '>' in from_header:
-        return from_header.split('<')[1].split('>')[0].strip().lower()
-    return from_header.strip().lower()
+    Returns the new last processed UID after handling a batch.
+
+    The watermark never moves past a requested UID that was not handled,
+    so unanswered messages are picked up again by the next search.
+    """
+    if not handled:
+        return last_uid
+
+    new_last_uid = max(map(int, handled))
+    missed = [int(m) for m in requested if m not in handled]
+    if missed:
+        new_last_uid = min(new_last_uid, min(missed) - 1)
+    return max(last_uid, new_last_uid)
+
+
+def parse_headers(blob: bytes) -> dict[str, str]:
+    """
+    Parses a header-only FETCH response into {lower-cased name: value}.
+
+    The full email parser is unnecessary for the handful of header fields
+    we fetch. Folded lines are unfolded and the first occurrence of a
+    repeated header wins, matching Message.get().
+    """
+    headers: dict[str, str] = {}
+    name = ''
+    for line in blob.splitlines():
+        if not line.strip():
+            continue
+
+        # Continuation of a folded header
+        if line[:1] in (b' ', b'\t'):
+            if name:
+                headers[name] += ' ' + line.strip().decode('utf-8', 'replace')
+            continue
+
+        key, sep, value = line.partition(b':')
+        if not sep:
+            name = ''
+            continue
+
+        key_str = key.strip().lower().decode('utf-8', 'replace')
+        if key_str in headers:
+            # Ignore repeats (and their continuation lines)
+            name = ''
+            continue
+
+        name = key_str
+        headers[name] = value.strip().decode('utf-8', 'replace')
+    return headers
+
+
+def extract_reply_details(headers: dict[str, str]) -> Optional[tuple[str, str, str, str]]:
+    """
+    Extracts (from_addr, subject, message_id, references) from a fetched
+    message, or returns None if it is not from the target sender.
+    """
+    # Extract details
+    from_addr = parse_email_from(headers.get('from', ''))
+    subject = headers.get('subject', '(no subject)')
+    message_id_header = headers.get('message-id', '')
+    references = headers.get('references', '')
+
+    log.info("  → From: %s", from_addr)
+    log.info("  → Subject: %s", subject)
+
+    # Double-check sender (case-insensitive)
+    if from_addr != TARGET_SENDER_LOWER:
+        log.info("  → Skipped (sender mismatch)")
+        return None
+
+    return from_addr, subject, message_id_header, references
+
+
+def resolve_thread_id(
+    gmail_service: Any,
+    message_id_header: str,
+    thread_id_cache: OrderedDict[str, str],
+    http: Optional[Any] = None
+) -> Optional[str]:
+    """
+    Like lookup_thread_id, but returns None instead of raising so the
+    reply can still be sent without a thread ID.
+    """
+    try:
+        # Look up the exact message by Message-ID to get thread ID
+        return lookup_thread_id(gmail_service, message_id_header, thread_id_cache, http)
+    except Exception as e:
+        log.error("  ✗ Error getting thread ID: %s", e)
+        return None
+
+
+def reply_to_message(
+    gmail_service: Any,
+    headers: dict[str, str],
+    thread_id_cache: OrderedDict[str, str]
+) -> None:
+    """
+    Sends an auto-reply to a fetched message if it is from the target sender.
+
+    Args:
+        gmail_service: Authorized Gmail API service instance
+        headers: Parsed message headers (see parse_headers)
+        thread_id_cache: Message-ID -> threadId LRU cache
+    """
+    details = extract_reply_details(headers)
+    if not details:
+        return
+
+    from_addr, subject, message_id_header, references = details
+    log.info("  → Sending auto-reply...")
+
+    thread_id = resolve_thread_id(gmail_service, message_id_header, thread_id_cache)
+
+    send_reply(
+        gmail_service,
+        from_addr,
+        subject,
+        message_id_header,
+        thread_id,
+        references
+    )
+
+
+def reply_to_messages_batch(
+    gmail_service: Any,
+    creds: Credentials,
+    messages: List[dict[str, str]],
+    thread_id_cache: OrderedDict[str, str]
+) -> None:
+    """
+    Replies to several messages at once.
+
+    Thread IDs are looked up concurrently using a small thread pool; the
+    shared httplib2.Http behind gmail_service is not thread-safe, so each
+    worker executes its requests with its own authorized HTTP object.
+    The replies are then sent with Gmail batch requests (one HTTP round
+    trip per GMAIL_BATCH_LIMIT replies).
+    """
+    pending = [d for d in map(extract_reply_details, messages) if d]
+    if not pending:
+        return
+
+    log.info("  → Sending %d auto-replies...", len(pending))
+
+    local = threading.local()
+
+    def worker(message_id_header: str) -> Optional[str]:
+        if not hasattr(local, 'http'):
+            local.http = AuthorizedHttp(creds, http=httplib2.Http())
+        return resolve_thread_id(gmail_service, message_id_header, thread_id_cache, local.http)
+
+    with ThreadPoolExecutor(max_workers=REPLY_WORKERS) as executor:
+        thread_ids = list(executor.map(worker, [d[2] for d in pending]))
+
+    def on_sent(request_id: str, response: Any, exception: Optional[Exception]) -> None:
+        if exception:
+            log.error("  ✗ Failed to send reply: %s", exception)
+        else:
+            log.info("  ✓ Reply sent! Message ID: %s", response['id'])
+
+    for start in range(0, len(pending), GMAIL_BATCH_LIMIT):
+        batch = gmail_service.new_batch_http_request(callback=on_sent)
+        for (from_addr, subject, message_id_header, references), thread_id in zip(
+            pending[start:start + GMAIL_BATCH_LIMIT],
+            thread_ids[start:start + GMAIL_BATCH_LIMIT]
+        ):
+            body = build_reply_body(from_addr, subject, message_id_header, thread_id, references)
+            batch.add(gmail_service.users().messages().send(userId='me', body=body))
+
+        try:
+            batch.execute()
+        except Exception as e:
+            log.error("  ✗ Failed to send replies: %s", e)
+
+
+class ResumableIMAP4_SSL(imaplib.IMAP4_SSL):
+    """
+    IMAP4_SSL that offers a previous TLS session for resumption.
+
+    Responses are read through our own buffer instead of imaplib's file
+    object, so has_buffered_data() can tell whether a response is already
+    waiting before select() is used on the socket.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        ssl_context: ssl.SSLContext,
+        session: Optional[ssl.SSLSession] = None,
+        timeout: Optional[float] = None
+    ):
+        self.tls_session = session
+        self._read_buffer = bytearray()
+        super().__init__(host, ssl_context=ssl_context, timeout=timeout)
+
+    def _create_socket(self, timeout: Optional[float]) -> socket.socket:
+        sock = imaplib.IMAP4._create_socket(self, timeout)
+        return self.ssl_context.wrap_socket(
+            sock,
+            server_hostname=self.host,
+            session=self.tls_session
+        )
+
+    def has_buffered_data(self) -> bool:
+        """True if response data is waiting in our buffer or the TLS layer."""
+        return bool(self._read_buffer) or self.sock.pending() > 0
+
+    def _fill_buffer(self) -> bool:
+        """Read more data from the socket; returns False on EOF."""
+        chunk = self.sock.recv(IMAP_READ_SIZE)
+        self._read_buffer += chunk
+        return bool(chunk)
+
+    def read(self, size: int) -> bytes:
+        """Read 'size' bytes from the server."""
+        while len(self._read_buffer) < size and self._fill_buffer():
+            pass
+
+        data = bytes(self._read_buffer[:size])
+        del self._read_buffer[:size]
+        return data
+
+    def readline(self) -> bytes:
+        """Read a line from the server."""
+        while True:
+            end = self._read_buffer.find(b'\n')
+            if end >= 0:
+                end += 1
+                break
+            if len(self._read_buffer) > IMAP_MAX_LINE or not self._fill_buffer():
+                end = len(self._read_buffer)
+                break
+
+        if end > IMAP_MAX_LINE:
+            raise self.error(f'got more than {IMAP_MAX_LINE} bytes')
+
+        line = bytes(self._read_buffer[:end])
+        del self._read_buffer[:end]
+        return line
 
 
 class ImapIdleClient:
     """IMAP client with IDLE support using standard imaplib."""
 
+    # Shared across reconnects so the TLS handshake can be resumed
+    _ssl_context = ssl.create_default_context()
+    _tls_session: Optional[ssl.SSLSession] = None
+
     def __init__(self, host: str, username: str, access_token: str):
         self.host = host
         self.username = username
-        self.access_token = access_token
-        self.imap: Optional[imaplib.IMAP4_SSL] = None
+        self.set_access_token(access_token)
+        self.imap: Optional[ResumableIMAP4_SSL] = None
+        self.uidvalidity: Optional[int] = None
+        # Lowest mod-sequence not yet handled (None if CONDSTORE is unavailable)
+        self.modseq: Optional[int] = None
+        # Watermark from the last changed_only search, until commit_modseq()
+        self._searched_modseq: Optional[int] = None
+
+        # Multiplex the IMAP socket with a self-pipe for external wakeups
+        self.sel = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_w, False)
+        self.sel.register(self._wakeup_r, selectors.EVENT_READ)
 
     def connect(self) -> None:
         """Connect to IMAP server and authenticate."""
-        self.imap = imaplib.IMAP4_SSL(self.host)
+        self.imap = ResumableIMAP4_SSL(
+            self.host,
+            ImapIdleClient._ssl_context,
+            ImapIdleClient._tls_session,
+            timeout=IMAP_SOCKET_TIMEOUT
+        )
+        self._enable_keepalive()
+        self.sel.register(self.imap.sock, selectors.EVENT_READ)
 
         # Authenticate using OAuth2
-        auth_string = generate_oauth2_string(self.username, self.access_token)
-        self.imap.authenticate('XOAUTH2', lambda _: auth_string.encode())
+        self.imap.authenticate('XOAUTH2', self._auth_response)
+
+        # Remember the session (TLS 1.3 tickets arrive after the handshake)
+        sock = cast(ssl.SSLSocket, self.imap.sock)
+        log.debug("TLS session reused: %s", sock.session_reused)
+        ImapIdleClient._tls_session = sock.session
+
+        # CONDSTORE lets searches skip messages unchanged since the last pass.
+        # Capabilities are re-read since servers advertise more after login.
+        _, data = self.imap.capability()
+        capabilities = data[0].decode().upper().split() if data and data[0] else []
+        condstore = 'CONDSTORE' in capabilities and 'ENABLE' in capabilities
+        if condstore:
+            self.imap.xatom('ENABLE', 'CONDSTORE')
 
         # Select INBOX
         self.imap.select('INBOX')
 
+        # UIDs are only comparable across sessions while UIDVALIDITY is unchanged
+        _, data = self.imap.response('UIDVALIDITY')
+        if data and data[0]:
+            self.uidvalidity = int(data[0])
+
+        if condstore:
+            _, data = self.imap.response('HIGHESTMODSEQ')
+            if data and data[0]:
+                self.modseq = int(data[0]) + 1
+
+    def set_access_token(self, access_token: str) -> None:
+        """Set the access token and pre-encode the XOAUTH2 auth string."""
+        self.access_token = access_token
+        self._auth_bytes = generate_oauth2_string(self.username, access_token).encode()
+
+    def _auth_response(self, _challenge: bytes) -> bytes:
+        """XOAUTH2 authenticator callback."""
+        return self._auth_bytes
+
+    def _enable_keepalive(self) -> None:
+        """Enable TCP keepalive so dropped connections are detected quickly."""
+        if not self.imap:
+            return
+
+        sock = self.imap.sock
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        # Fine-grained keepalive timing is not available on every platform
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, TCP_KEEPALIVE_IDLE)
+        if hasattr(socket, 'TCP_KEEPINTVL'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, TCP_KEEPALIVE_INTERVAL)
+        if hasattr(socket, 'TCP_KEEPCNT'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, TCP_KEEPALIVE_COUNT)
+
     def start_idle(self) -> None:
         """Start IDLE mode."""
         if self.imap:
@@ -194,7 +820,14 @@ class ImapIdleClient:
             # Wait for continuation response
             self.imap.readline()
 
-    def check_idle(self, timeout: int = 300) -> bool:
+    def wakeup(self) -> None:
+        """Interrupt a pending check_idle() (safe to call from a signal handler)."""
+        try:
+            os.write(self._wakeup_w, b'\0')
+        except OSError:
+            pass
+
+    def check_idle(self, timeout: float = IDLE_TIMEOUT) -> bool:
         """
         Check for IDLE responses.
 
@@ -202,14 +835,22 @@ class ImapIdleClient:
             timeout: Timeout in seconds
 
         Returns:
-            True if new data received, False if timeout
+            True if new data received, False if timeout or wakeup()
         """
         if not self.imap:
             return False
 
         try:
-            # Set socket timeout
-            self.imap.sock.settimeout(timeout)
+            # Data already read off the socket is invisible to select()
+            if not self.imap.has_buffered_data():
+                events = self.sel.select(timeout)
+                if not events:
+                    return False
+
+                for key, _ in events:
+                    if key.fileobj == self._wakeup_r:
+                        os.read(self._wakeup_r, 64)
+                        return False
 
             # Read response
             line = self.imap.readline()
@@ -231,39 +872,104 @@ class ImapIdleClient:
             self.imap.readline()
             self.imap.readline()
 
-    def search_unseen_from(self, sender: str) -> List[str]:
-        """Search for unseen messages from specific sender."""
+    def search_unseen_from(
+        self,
+        sender: str,
+        min_uid: Optional[int] = None,
+        changed_only: bool = False
+    ) -> List[str]:
+        """
+        Search for unseen messages from specific sender.
+
+        Args:
+            sender: Sender email address
+            min_uid: Only return messages with UID >= min_uid (None for full scan)
+            changed_only: Only return messages changed since the last
+                commit_modseq() (requires CONDSTORE; ignored otherwise)
+
+        Returns:
+            List of message UIDs
+        """
         if not self.imap:
             return []
 
         try:
-            search_criteria = f'(UNSEEN FROM "{sender}")'
-            print(f"  → DEBUG: IMAP search criteria: {search_criteria}")
-            status, data = self.imap.search(None, search_criteria)
-            print(f"  → DEBUG: IMAP search status: {status}, data: {data}")
+            criteria = ['UNSEEN', f'FROM "{sender}"']
+            if min_uid is not None:
+                criteria.insert(0, f'UID {min_uid}:*')
+            if changed_only and self.modseq is not None:
+                criteria.insert(0, f'MODSEQ {self.modseq}')
+            search_criteria = f'({" ".join(criteria)})'
+            log.debug("IMAP search criteria: %s", search_criteria)
+            status, data = self.imap.uid('SEARCH', None, search_criteria)
+            log.debug("IMAP search status: %s, data: %s", status, data)
             if data and data[0]:
-                msg_ids = data[0].decode().split()
-                print(f"  → DEBUG: Found message IDs: {msg_ids}")
+                response = data[0].decode()
+
+                # A MODSEQ search appends the highest mod-sequence of the matches
+                match = MODSEQ_PATTERN.search(response)
+                if match:
+                    if changed_only:
+                        self._searched_modseq = int(match.group(1)) + 1
+                    response = response[:match.start()]
+
+                msg_ids = response.split()
+                # "n:*" always matches the highest UID, even when it is below n
+                if min_uid is not None:
+                    msg_ids = [m for m in msg_ids if int(m) >= min_uid]
+                log.debug("Found message IDs: %s", msg_ids)
                 return msg_ids
             return []
+        except imaplib.IMAP4.abort:
+            # Connection lost - let the caller reconnect
+            raise
         except Exception as e:
-            print(f"  → DEBUG: IMAP search exception: {e}")
+            log.debug("IMAP search exception: %s", e)
             return []
 
-    def fetch_message(self, msg_id: str) -> Optional[Message]:
-        """Fetch a message by ID."""
-        if not self.imap:
-            return None
+    def commit_modseq(self) -> None:
+        """Move the MODSEQ watermark past the last changed_only search results."""
+        if self._searched_modseq is not None:
+            self.modseq = self._searched_modseq
+            self._searched_modseq = None
+
+    def fetch_messages_batch(self, msg_ids: List[str]) -> dict[str, dict[str, str]]:
+        """Fetch several messages in a single UID FETCH command, keyed by UID."""
+        if not self.imap or not msg_ids:
+            return {}
 
+        messages: dict[str, dict[str, str]] = {}
         try:
-            _, data = self.imap.fetch(msg_id, '(RFC822)')
-            if data and data[0] and isinstance(data[0], tuple):
-                email_body = data[0][1]
-                if isinstance(email_body, bytes):
-                    return email.message_from_bytes(email_body)
-            return None
+            # Header-only fetch; PEEK leaves the \Seen flag untouched
+            _, data = self.imap.uid('FETCH', ','.join(msg_ids), HEADER_FETCH_ITEMS)
+        except imaplib.IMAP4.abort:
+            # Connection lost - let the caller reconnect
+            raise
+        except imaplib.IMAP4.error as e:
+            log.error("  ✗ IMAP fetch failed: %s", e)
+            return messages
+
+        for item in data:
+            # Each message is a (b'<seq> (UID <uid> BODY[...] {n}', body)
+            # tuple followed by a closing b')'
+            if not isinstance(item, tuple):
+                continue
+            match = UID_PATTERN.search(item[0])
+            if match and isinstance(item[1], bytes):
+                messages[match.group(1).decode()] = parse_headers(item[1])
+        return messages
+
+    def mark_seen(self, msg_ids: List[str]) -> None:
+        """Set the \\Seen flag on handled messages in a single UID STORE."""
+        if not self.imap or not msg_ids:
+            return
+
+        try:
+            self.imap.uid('STORE', ','.join(msg_ids), '+FLAGS', '(\\Seen)')
+        except imaplib.IMAP4.abort:
+            raise
         except Exception:
-            return None
+            pass
 
     def noop(self) -> None:
         """Send NOOP command (keepalive)."""
@@ -278,6 +984,10 @@ class ImapIdleClient:
             except Exception:
                 pass
 
+        self.sel.close()
+        os.close(self._wakeup_r)
+        os.close(self._wakeup_w)
+
 
 def monitor_inbox() -> None:
     """
@@ -285,214 +995,222 @@ def monitor_inbox() -> None:
     """
     global YOUR_EMAIL
 
-    print("=" * 60)
-    print("Gmail Auto-Reply Monitor")
-    print("=" * 60)
+    log.info("=" * 60)
+    log.info("Gmail Auto-Reply Monitor")
+    log.info("=" * 60)
 
     # Authenticate with Gmail
-    print("\n[1/3] Authenticating with Gmail...")
+    log.info("[1/3] Authenticating with Gmail...")
     creds = get_gmail_credentials()
+    refresh_at = token_refresh_deadline(creds)
 
-    # Build Gmail API service for sending replies
-    gmail_service = build('gmail', 'v1', credentials=creds)
+    # Build Gmail API service for sending replies, reusing one keep-alive
+    # HTTP connection and skipping the on-disk discovery cache
+    authed_http = AuthorizedHttp(creds, http=httplib2.Http())
+    gmail_service = build('gmail', 'v1', http=authed_http, cache_discovery=False)
 
-    # Get user's email address
-    profile = gmail_service.users().getProfile(userId='me').execute()
-    YOUR_EMAIL = profile['emailAddress']
-    print(f"  ✓ Authenticated as: {YOUR_EMAIL}")
+    # Get user's email address (from the ID token when available)
+    YOUR_EMAIL = email_from_id_token(creds) or ''
+    if not YOUR_EMAIL:
+        profile = gmail_service.users().getProfile(userId='me').execute()
+        YOUR_EMAIL = profile['emailAddress']
+    log.info("  ✓ Authenticated as: %s", YOUR_EMAIL)
 
-    print(f"\n[2/3] Monitoring for emails from: {TARGET_SENDER_EMAIL}")
-    print("  ✓ Using IMAP IDLE (2-3 second latency)")
-    print(f"  ✓ Auto-reply message: '{AUTO_REPLY_MESSAGE}'")
+    log.info("[2/3] Monitoring for emails from: %s", TARGET_SENDER_EMAIL)
+    log.info("  ✓ Using IMAP IDLE (2-3 second latency)")
+    log.info("  ✓ Auto-reply message: '%s'", AUTO_REPLY_MESSAGE)
 
-    print("\n[3/3] Connecting to Gmail IMAP...")
+    log.info("[3/3] Connecting to Gmail IMAP...")
 
-    # Track processed message IDs to avoid duplicates
-    processed_messages: set[str] = set()
+    # Track processed message UIDs to avoid duplicates (bounded LRU)
+    processed_messages: OrderedDict[str, None] = OrderedDict()
 
-    while True:
-        imap_client: Optional[ImapIdleClient] = None
+    # Highest processed UID from previous runs
+    imap_state = load_imap_state()
+
+    imap_client: Optional[ImapIdleClient] = None
+
+    # Set on SIGTERM; also interrupts the reconnect backoff wait
+    stop_requested = threading.Event()
+
+    def handle_sigterm(signum: int, frame: Any) -> None:
+        stop_requested.set()
+        if imap_client:
+            imap_client.wakeup()
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    # Cache Message-ID -> Gmail thread ID to avoid repeated API lookups (bounded LRU)
+    thread_id_cache: OrderedDict[str, str] = OrderedDict()
+
+    backoff = RECONNECT_BACKOFF_INITIAL
+
+    while not stop_requested.is_set():
+        imap_client = None
         try:
             # Refresh token if needed
-            if creds.expired and creds.refresh_token:
-                print("  → Refreshing access token...")
-                creds.refresh(Request())
+            if time.monotonic() >= refresh_at and creds.refresh_token:
+                log.info("  → Refreshing access token...")
+                refresh_at = refresh_credentials(creds)
 
             # Connect to Gmail IMAP with OAuth2
             imap_client = ImapIdleClient('imap.gmail.com', YOUR_EMAIL, creds.token or '')
             imap_client.connect()
 
-            print("  ✓ Connected to Gmail IMAP")
+            log.info("  ✓ Connected to Gmail IMAP")
+            backoff = RECONNECT_BACKOFF_INITIAL
+
+            # Resume after the last processed UID if the mailbox UIDs are still valid
+            uidvalidity = imap_client.uidvalidity
+            if uidvalidity is not None and uidvalidity == imap_state.get('uidvalidity'):
+                last_uid = imap_state['last_uid']
+                log.info("  → Resuming after UID %d", last_uid)
+            else:
+                # First run or UIDVALIDITY changed - fall back to a full scan
+                last_uid = 0
+                processed_messages.clear()
 
             # Check for existing unread messages on startup
-            print("\n  → Checking for existing unread messages...")
-            existing_messages = imap_client.search_unseen_from(TARGET_SENDER_EMAIL)
+            log.info("  → Checking for existing unread messages...")
+            existing_messages = imap_client.search_unseen_from(
+                TARGET_SENDER_EMAIL,
+                last_uid + 1 if last_uid else None
+            )
             if existing_messages:
-                print(f"  ⚠ Found {len(existing_messages)} existing unread message(s) from {TARGET_SENDER_EMAIL}")
-                print("  → Processing existing messages...")
-
-                for msg_id in existing_messages:
-                    if msg_id in processed_messages:
-                        continue
-
-                    processed_messages.add(msg_id)
-                    email_message = imap_client.fetch_message(msg_id)
-
-                    if email_message:
-                        from_addr = parse_email_from(email_message.get('From', ''))
-                        subject = email_message.get('Subject', '(no subject)')
-                        message_id_header = email_message.get('Message-ID', '')
-                        references = email_message.get('References', '')
-
-                        print(f"  → From: {from_addr}")
-                        print(f"  → Subject: {subject}")
-
-                        if from_addr == TARGET_SENDER_EMAIL.lower():
-                            print("  → Sending auto-reply...")
-
-                            try:
-                                gmail_msg = gmail_service.users().messages().list(
-                                    userId='me',
-                                    q=f'from:{TARGET_SENDER_EMAIL}',
-                                    maxResults=1
-                                ).execute()
-
-                                thread_id = None
-                                if 'messages' in gmail_msg and gmail_msg['messages']:
-                                    thread_id = gmail_msg['messages'][0]['threadId']
-
-                                send_reply(
-                                    gmail_service,
-                                    from_addr,
-                                    subject,
-                                    message_id_header,
-                                    thread_id,
-                                    references
-                                )
-                            except Exception as e:
-                                print(f"  ✗ Error: {e}")
-                                send_reply(
-                                    gmail_service,
-                                    from_addr,
-                                    subject,
-                                    message_id_header,
-                                    None,
-                                    references
-                                )
+                log.warning(
+                    "  ⚠ Found %d existing unread message(s) from %s",
+                    len(existing_messages),
+                    TARGET_SENDER_EMAIL
+                )
+                log.info("  → Processing existing messages...")
+
+                new_ids = [m for m in existing_messages if m not in processed_messages]
+
+                # IMAP stays single-threaded; only the Gmail API calls fan out
+                fetched = imap_client.fetch_messages_batch(new_ids)
+                handled_ids = list(fetched)
+                remember_processed(processed_messages, handled_ids)
+
+                if len(fetched) > 1:
+                    reply_to_messages_batch(
+                        gmail_service,
+                        creds,
+                        list(fetched.values()),
+                        thread_id_cache
+                    )
+                else:
+                    for headers in fetched.values():
+                        reply_to_message(gmail_service, headers, thread_id_cache)
+
+                if handled_ids and uidvalidity is not None:
+                    last_uid = advance_last_uid(last_uid, new_ids, handled_ids)
+                    imap_state = {'uidvalidity': uidvalidity, 'last_uid': last_uid}
+                    save_imap_state(uidvalidity, last_uid)
+
+                imap_client.mark_seen(handled_ids)
             else:
-                print("  ✓ No existing unread messages")
+                log.info("  ✓ No existing unread messages")
 
-            print("\n" + "=" * 60)
-            print(f"MONITORING ACTIVE - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            print("=" * 60)
-            print("Waiting for emails... (Press Ctrl+C to stop)\n")
+            log.info("=" * 60)
+            log.info("MONITORING ACTIVE")
+            log.info("=" * 60)
+            log.info("Waiting for emails... (Press Ctrl+C to stop)")
 
             # IDLE monitoring loop
             while True:
+                # A SIGTERM before the client existed never reached wakeup()
+                if stop_requested.is_set():
+                    break
+
                 # Start IDLE mode
                 imap_client.start_idle()
 
-                # Wait for notifications (5-minute timeout for keepalive)
-                has_new = imap_client.check_idle(timeout=300)
+                # Wait for notifications (9.5-minute timeout for keepalive),
+                # waking up in time for the next token refresh
+                timeout = min(IDLE_TIMEOUT, max(0.0, refresh_at - time.monotonic()))
+                has_new = imap_client.check_idle(timeout=timeout)
 
                 # Stop IDLE mode
                 imap_client.stop_idle()
 
+                if stop_requested.is_set():
+                    break
+
                 if has_new:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] New activity detected!")
+                    log.info("New activity detected!")
 
                     # Search for unread emails from target sender
-                    messages = imap_client.search_unseen_from(TARGET_SENDER_EMAIL)
-                    print(f"  → DEBUG: search_unseen_from returned {len(messages)} message(s)")
+                    messages = imap_client.search_unseen_from(
+                        TARGET_SENDER_EMAIL,
+                        last_uid + 1 if last_uid else None,
+                        changed_only=True
+                    )
+                    log.debug("search_unseen_from returned %d message(s)", len(messages))
 
                     if messages:
-                        print(f"  → Found {len(messages)} new message(s) from {TARGET_SENDER_EMAIL}")
-
-                        for msg_id in messages:
-                            # Skip if already processed
-                            if msg_id in processed_messages:
-                                continue
-
-                            processed_messages.add(msg_id)
-
-                            # Fetch message
-                            email_message = imap_client.fetch_message(msg_id)
-
-                            if not email_message:
-                                continue
-
-                            # Extract details
-                            from_addr = parse_email_from(email_message.get('From', ''))
-                            subject = email_message.get('Subject', '(no subject)')
-                            message_id_header = email_message.get('Message-ID', '')
-                            references = email_message.get('References', '')
-
-                            print(f"  → From: {from_addr}")
-                            print(f"  → Subject: {subject}")
-
-                            # Double-check sender (case-insensitive)
-                            if from_addr == TARGET_SENDER_EMAIL.lower():
-                                print("  → Sending auto-reply...")
-
-                                # Get Gmail message for thread ID
-                                try:
-                                    # Search for the message by sender to get thread ID
-                                    gmail_msg = gmail_service.users().messages().list(
-                                        userId='me',
-                                        q=f'from:{TARGET_SENDER_EMAIL}',
-                                        maxResults=1
-                                    ).execute()
-
-                                    thread_id = None
-                                    if 'messages' in gmail_msg and gmail_msg['messages']:
-                                        thread_id = gmail_msg['messages'][0]['threadId']
-
-                                    # Send reply
-                                    send_reply(
-                                        gmail_service,
-                                        from_addr,
-                                        subject,
-                                        message_id_header,
-                                        thread_id,
-                                        references
-                                    )
-
-                                except Exception as e:
-                                    print(f"  ✗ Error getting thread ID: {e}")
-                                    # Try sending without thread ID
-                                    send_reply(
-                                        gmail_service,
-                                        from_addr,
-                                        subject,
-                                        message_id_header,
-                                        None,
-                                        references
-                                    )
-                            else:
-                                print("  → Skipped (sender mismatch)")
-
-                    print()
+                        log.info("  → Found %d new message(s) from %s", len(messages), TARGET_SENDER_EMAIL)
+
+                        # Skip already processed messages
+                        new_ids = [m for m in messages if m not in processed_messages]
+
+                        # Fetch all new messages in one round trip
+                        fetched = imap_client.fetch_messages_batch(new_ids)
+                        handled_ids = list(fetched)
+                        remember_processed(processed_messages, handled_ids)
+
+                        for headers in fetched.values():
+                            reply_to_message(gmail_service, headers, thread_id_cache)
+
+                        if handled_ids and uidvalidity is not None:
+                            last_uid = advance_last_uid(last_uid, new_ids, handled_ids)
+                            imap_state = {'uidvalidity': uidvalidity, 'last_uid': last_uid}
+                            save_imap_state(uidvalidity, last_uid)
+
+                        imap_client.mark_seen(handled_ids)
+
+                        # Only skip these changes in later searches once all were handled
+                        if len(handled_ids) == len(new_ids):
+                            imap_client.commit_modseq()
+
                 else:
                     # Timeout - send keepalive NOOP
                     imap_client.noop()
 
                 # Check if token needs refresh
-                if creds.expired:
-                    print("  → Token expired, reconnecting...")
+                if time.monotonic() >= refresh_at:
+                    log.info("  → Token expiring, reconnecting...")
+                    imap_client.logout()
+                    imap_client = None
                     break
 
         except KeyboardInterrupt:
-            print("\n\nStopping monitor (user interrupt)...")
+            log.info("Stopping monitor (user interrupt)...")
             if imap_client:
                 imap_client.logout()
             sys.exit(0)
 
         except Exception as e:
-            print(f"\n✗ Connection error: {e}")
-            print("  → Reconnecting in 5 seconds...")
+            if isinstance(e, RefreshError) and not e.retryable:
+                # Revoked or under-scoped tokens do not recover by retrying
+                log.error("✗ Token refresh failed: %s", e)
+                log.error("Delete %s and run the script again to re-authenticate.", TOKEN_FILE)
+                if imap_client:
+                    imap_client.logout()
+                sys.exit(1)
+
+            # Jitter keeps multiple monitors from reconnecting in lockstep
+            delay = backoff + random.random()
+            log.error("✗ Connection error: %s", e)
+            log.info("  → Reconnecting in %.1f seconds...", delay)
             if imap_client:
                 imap_client.logout()
-            time.sleep(5)
+                imap_client = None
+            stop_requested.wait(delay)
+            backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+
+    log.info("Stopping monitor (SIGTERM)...")
+    if imap_client:
+        imap_client.logout()
 
 
 if __name__ == '__main__':